@@ -1,9 +1,23 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+
+import httpx
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from service import run
+from serp_api_access import SERPAPI_TIMEOUT
+from service import load_encoder, run_async
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # load the embedding model before the first request instead of during it
+    await asyncio.to_thread(load_encoder)
+    # one SerpAPI client for the whole process, so requests reuse warm TLS connections
+    async with httpx.AsyncClient(timeout=SERPAPI_TIMEOUT) as client:
+        app.state.serp_client = client
+        yield
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # allow Next.js dev server (localhost:3000)
 app.add_middleware(
@@ -19,9 +33,9 @@ class Req(BaseModel):
     item: str
 
 @app.post("/api/analyze")
-def analyze(req: Req):
-    return run(req.location, req.item)
+async def analyze(req: Req, request: Request):
+    return await run_async(req.location, req.item, client=request.app.state.serp_client)
 
 @app.get("/health")
 def health():
-    return {"ok": True}
\ No newline at end of file
+    return {"ok": True}
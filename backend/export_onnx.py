@@ -0,0 +1,24 @@
+# backend/export_onnx.py
+# One-time export of all-MiniLM-L6-v2 to ONNX + dynamic int8 quantization,
+# for EMBED_BACKEND=onnx. Usage: python export_onnx.py [out_dir]
+import os, sys
+
+from optimum.onnxruntime import ORTModelForFeatureExtraction
+from onnxruntime.quantization import quantize_dynamic, QuantType
+from transformers import AutoTokenizer
+
+MODEL_ID = "sentence-transformers/all-MiniLM-L6-v2"
+
+def export(out_dir: str) -> None:
+    model = ORTModelForFeatureExtraction.from_pretrained(MODEL_ID, export=True)
+    model.save_pretrained(out_dir)
+    AutoTokenizer.from_pretrained(MODEL_ID).save_pretrained(out_dir)
+
+    quantize_dynamic(
+        os.path.join(out_dir, "model.onnx"),
+        os.path.join(out_dir, "model.int8.onnx"),
+        weight_type=QuantType.QInt8,
+    )
+
+if __name__ == "__main__":
+    export(sys.argv[1] if len(sys.argv) > 1 else os.getenv("ONNX_MODEL_DIR", "onnx/all-MiniLM-L6-v2"))
@@ -0,0 +1,10 @@
+# backend/http_session.py
+import requests
+from requests.adapters import HTTPAdapter
+
+# One keep-alive connection pool for the (blocking) Ollama calls, instead of a
+# fresh TCP handshake per request. SerpAPI goes through the app's httpx.AsyncClient.
+session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=64)
+session.mount("http://", _adapter)
+session.mount("https://", _adapter)
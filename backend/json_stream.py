@@ -0,0 +1,62 @@
+# backend/json_stream.py
+import json
+import re
+
+_decoder = json.JSONDecoder()
+
+
+class JsonEndTracker:
+    """
+    Follows streamed text and finds where the first top-level JSON object/array
+    closes. Anything before the opening bracket is skipped, and brackets inside
+    string literals (including escaped quotes) don't count.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.in_str = False
+        self.esc = False
+
+    def feed(self, piece: str) -> int:
+        """Returns the index in piece just past the closing bracket, or -1 if not closed yet."""
+        for i, ch in enumerate(piece):
+            if self.in_str:
+                if self.esc:
+                    self.esc = False
+                elif ch == "\\":
+                    self.esc = True
+                elif ch == '"':
+                    self.in_str = False
+            elif not self.started:
+                if ch in "{[":
+                    self.depth, self.started = 1, True
+            elif ch == '"':
+                self.in_str = True
+            elif ch in "{[":
+                self.depth += 1
+            elif ch in "}]":
+                self.depth -= 1
+                if self.depth == 0:
+                    return i + 1
+        return -1
+
+
+def complete_array_items(text: str, key: str) -> list:
+    """
+    Returns the fully written elements of the array under `key` in JSON that was
+    cut off mid-stream: '{"summaries": [{...}, {...}, {"id": 3, "summ' gives the
+    first two elements.
+    """
+    m = re.search(r'"%s"\s*:\s*\[' % re.escape(key), text)
+    if not m:
+        return []
+    items, pos = [], m.end()
+    while True:
+        while pos < len(text) and text[pos] in " \t\r\n,":
+            pos += 1
+        try:
+            item, pos = _decoder.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            return items
+        items.append(item)
@@ -1,20 +1,25 @@
-from serpapi import GoogleSearch
 from typing import List, Dict
+import httpx
 
 # API_KEY
 SERPAPI_API_KEY = "YOUR_API_KEY"
+SERPAPI_SEARCH_URL = "https://serpapi.com/search"
+SERPAPI_TIMEOUT = 120
 
 # ----------------------------
 # SerpAPI: search places + fetch reviews
 # ----------------------------
-def search_places_for_item_near_location(item: str, location: str, limit: int = 5) -> List[Dict]:
+async def search_places_async(client: httpx.AsyncClient, item: str, location: str, limit: int = 5) -> List[Dict]:
     params = {
         "engine": "google_maps",
         "q": f"{item} near {location}",
         "api_key": SERPAPI_API_KEY,
     }
-    results = GoogleSearch(params).get_dict()
+    resp = await client.get(SERPAPI_SEARCH_URL, params=params)
+    resp.raise_for_status()
+    return parse_places(resp.json(), limit)
 
+def parse_places(results: Dict, limit: int) -> List[Dict]:
     places = []
     for it in (results.get("local_results") or []):
         title = it.get("title") or it.get("name")
@@ -33,7 +38,12 @@ def search_places_for_item_near_location(item: str, location: str, limit: int =
 
     return places
 
-def fetch_reviews(data_id: str, max_reviews: int = 100) -> List[Dict]:
+async def fetch_reviews_async(client: httpx.AsyncClient, data_id: str, max_reviews: int = 100) -> tuple[List[Dict], bool]:
+    """
+    Returns (reviews, complete). Awaits each page so several places can be fetched
+    concurrently on one client. A failed page (rate limit, quota, network) ends
+    pagination early with complete=False instead of failing the whole request.
+    """
     reviews: List[Dict] = []
     params = {
         "engine": "google_maps_reviews",
@@ -42,7 +52,12 @@ def fetch_reviews(data_id: str, max_reviews: int = 100) -> List[Dict]:
     }
 
     while True:
-        results = GoogleSearch(params).get_dict()
+        try:
+            resp = await client.get(SERPAPI_SEARCH_URL, params=params)
+            resp.raise_for_status()
+        except httpx.HTTPError:
+            return reviews[:max_reviews], False
+        results = resp.json()
         batch = results.get("reviews", []) or []
         reviews.extend(batch)
 
@@ -54,4 +69,4 @@ def fetch_reviews(data_id: str, max_reviews: int = 100) -> List[Dict]:
             break
         params["next_page_token"] = next_token
 
-    return reviews[:max_reviews]
\ No newline at end of file
+    return reviews[:max_reviews], True
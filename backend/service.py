@@ -1,22 +1,193 @@
 # backend/service.py
-import os, json, re
-from typing import List, Dict
-
-from serp_api_access import search_places_for_item_near_location, fetch_reviews
-from sentence_transformers import SentenceTransformer, util
-import requests
+import os, json, re, asyncio, threading, time, unicodedata
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Dict, Optional, Union
+
+from serp_api_access import SERPAPI_TIMEOUT, search_places_async, fetch_reviews_async
+from http_session import session
+from json_stream import JsonEndTracker, complete_array_items
+from rapidfuzz import fuzz, process
+import numpy as np
+import httpx
 
 OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434/api/generate")
 OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "phi3:mini")
+OLLAMA_EMBED_URL = os.getenv("OLLAMA_EMBED_URL", "http://localhost:11434/api/embed")
+OLLAMA_EMBED_MODEL = os.getenv("OLLAMA_EMBED_MODEL", "nomic-embed-text")
+# "sentence-transformers" (in-process MiniLM), "onnx" (int8 MiniLM, see export_onnx.py)
+# or "ollama" (/api/embed)
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "sentence-transformers")
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", "onnx/all-MiniLM-L6-v2")
+# keep models resident between requests instead of paying a cold load each time
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
 
 MAX_PLACES = 7
 MAX_REVIEWS_PER_PLACE = 100
 MAX_SNIPPETS_TO_SEND = 10
-
-embed_model = SentenceTransformer("all-MiniLM-L6-v2")
-
-def embed(text: str):
-    return embed_model.encode(text, convert_to_tensor=True, normalize_embeddings=True)
+EMBED_CACHE_SIZE = 10_000
+RESPONSE_CACHE_SIZE = 256
+RESPONSE_CACHE_TTL = 6 * 60 * 60  # seconds; reviews and rankings drift
+
+# Cosine cutoffs are model-specific: nomic-embed-text scores unrelated text much
+# higher than MiniLM, so the Ollama backend needs tighter defaults.
+_THRESHOLDS = {
+    "sentence-transformers": (0.45, 0.95),
+    "onnx": (0.45, 0.95),
+    "ollama": (0.60, 0.97),
+}
+_default_semantic, _default_cache = _THRESHOLDS.get(EMBED_BACKEND, _THRESHOLDS["sentence-transformers"])
+SEMANTIC_THRESHOLD = float(os.getenv("SEMANTIC_THRESHOLD", _default_semantic))
+RESPONSE_CACHE_THRESHOLD = float(os.getenv("RESPONSE_CACHE_THRESHOLD", _default_cache))
+
+# local encoders are loaded on first use (or by the app at startup via load_encoder),
+# so importing this module doesn't pull in torch or a model
+_encoder = None
+_encoder_lock = threading.Lock()
+
+def load_encoder():
+    """
+    Returns the in-process encoder for EMBED_BACKEND: a SentenceTransformer, an
+    (tokenizer, int8 ONNX model) pair, or None for the Ollama backend.
+    """
+    global _encoder
+    with _encoder_lock:
+        if _encoder is None and EMBED_BACKEND == "sentence-transformers":
+            from sentence_transformers import SentenceTransformer
+
+            _encoder = SentenceTransformer("all-MiniLM-L6-v2")
+        elif _encoder is None and EMBED_BACKEND == "onnx":
+            from optimum.onnxruntime import ORTModelForFeatureExtraction
+            from transformers import AutoTokenizer
+
+            _encoder = (
+                AutoTokenizer.from_pretrained(ONNX_MODEL_DIR),
+                ORTModelForFeatureExtraction.from_pretrained(ONNX_MODEL_DIR, file_name="model.int8.onnx"),
+            )
+    return _encoder
+
+# (role, normalized text) -> embedding row, shared across requests (LRU order)
+_embed_cache: "OrderedDict[tuple[str, str], np.ndarray]" = OrderedDict()
+_embed_cache_lock = threading.Lock()  # places are embedded from several worker threads
+
+def normalize_cache_key(text: str) -> str:
+    # both default embedding models are uncased, so lowercasing doesn't change the embedding
+    return text.strip().lower()
+
+# nomic-embed-text is trained with task prefixes; other models get the text as-is
+NOMIC_PREFIXES = {"query": "search_query: ", "document": "search_document: "}
+
+def embed_batch(texts: list[str], role: str = "document") -> np.ndarray:
+    # one HTTP round-trip for the whole list
+    if OLLAMA_EMBED_MODEL.startswith("nomic-embed"):
+        texts = [NOMIC_PREFIXES[role] + t for t in texts]
+    r = session.post(OLLAMA_EMBED_URL, json={"model": OLLAMA_EMBED_MODEL, "input": texts, "keep_alive": OLLAMA_KEEP_ALIVE}, timeout=60)
+    r.raise_for_status()
+    x = np.asarray(r.json()["embeddings"], dtype=np.float32)
+    x /= np.maximum(np.linalg.norm(x, axis=1, keepdims=True), 1e-12)
+    return x
+
+def encode_onnx(texts: list[str]) -> np.ndarray:
+    # same pooling as the sentence-transformers MiniLM: mean over tokens, then L2
+    import torch
+
+    onnx_tokenizer, onnx_model = load_encoder()
+    enc = onnx_tokenizer(texts, padding=True, truncation=True, max_length=256, return_tensors="pt")
+    hidden = onnx_model(**enc).last_hidden_state
+    mask = enc["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+    pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+    return torch.nn.functional.normalize(pooled, dim=1).numpy()
+
+def encode_texts(texts: list[str], batch_size: int = 64, role: str = "document") -> np.ndarray:
+    """
+    Returns one contiguous (len(texts), dim) float32 matrix. Local encoders write
+    each chunk straight into it instead of stacking per-batch arrays.
+    """
+    # similarities are reduced straight to floats, so stay in numpy rather than
+    # paying torch tensor overhead on tiny ops
+    if not texts:
+        return np.empty((0, 0), dtype=np.float32)  # dim is unknown without encoding anything
+    if EMBED_BACKEND == "ollama":
+        return embed_batch(texts, role=role)  # already a single (N, dim) array from one request
+
+    out = None
+    for i in range(0, len(texts), batch_size):
+        chunk = texts[i:i + batch_size]
+        if EMBED_BACKEND == "onnx":
+            rows = encode_onnx(chunk)
+        else:
+            rows = load_encoder().encode(chunk, batch_size=len(chunk), convert_to_numpy=True, normalize_embeddings=True)
+        if out is None:
+            out = np.empty((len(texts), rows.shape[1]), dtype=np.float32)
+        out[i:i + len(chunk)] = rows
+    return out
+
+def embed(texts: list[str], batch_size: int = 64, role: str = "document") -> np.ndarray:
+    """
+    Returns one contiguous (len(texts), dim) float32 matrix, so the similarity step
+    is a single SGEMM. Cache hits and freshly encoded rows are written into it directly.
+    role is "query" or "document"; only prefix-trained models embed them differently.
+    """
+    keys = [(role, normalize_cache_key(t)) for t in texts]
+    if not keys:
+        return np.empty((0, 0), dtype=np.float32)
+    with _embed_cache_lock:
+        found = {k: _embed_cache[k] for k in keys if k in _embed_cache}
+    missing = list(dict.fromkeys(k for k in keys if k not in found))
+    fresh = encode_texts([text for _, text in missing], batch_size=batch_size, role=role)
+
+    dim = fresh.shape[1] if missing else next(iter(found.values())).shape[0]
+    out = np.empty((len(keys), dim), dtype=np.float32)
+    fresh_row = {k: j for j, k in enumerate(missing)}
+    miss_pos = [i for i, k in enumerate(keys) if k in fresh_row]
+    if miss_pos:
+        out[miss_pos] = fresh[[fresh_row[keys[i]] for i in miss_pos]]
+    for i, k in enumerate(keys):
+        if k not in fresh_row:
+            out[i] = found[k]
+
+    with _embed_cache_lock:
+        for k, j in fresh_row.items():
+            _embed_cache[k] = fresh[j].copy()  # don't keep the whole batch alive
+        _embed_cache.update(found)  # another thread may have evicted a hit meanwhile
+        for k in keys:
+            _embed_cache.move_to_end(k)
+        while len(_embed_cache) > EMBED_CACHE_SIZE:
+            _embed_cache.popitem(last=False)
+    return out
+
+# (stored_at, normalized location, item embedding, response) for recent requests,
+# oldest first. Locations must match exactly; only the item is compared semantically.
+_response_cache: List[tuple[float, str, np.ndarray, dict]] = []
+
+def normalize_location(location: str) -> str:
+    return " ".join(location.lower().split())
+
+def lookup_cached_response(location: str, item_emb: np.ndarray) -> Optional[dict]:
+    now = time.monotonic()
+    _response_cache[:] = [e for e in _response_cache if now - e[0] < RESPONSE_CACHE_TTL]
+    same_place = [e for e in _response_cache if e[1] == normalize_location(location)]
+    if not same_place:
+        return None
+    sims = np.stack([e[2] for e in same_place]) @ item_emb
+    i = int(np.argmax(sims))
+    if float(sims[i]) >= RESPONSE_CACHE_THRESHOLD:
+        return same_place[i][3]
+    return None
+
+def is_cacheable_response(response: dict, complete: bool = True) -> bool:
+    # complete=False means some place's review pages failed to fetch; a place with
+    # no fetched reviews usually means the same, and an empty summary means the
+    # model failed. None of these should stick around.
+    results = response["results"]
+    return complete and bool(results) and all(r["reviews_fetched"] > 0 and r["summary"] for r in results)
+
+def store_cached_response(location: str, item_emb: np.ndarray, response: dict, complete: bool = True) -> None:
+    if not is_cacheable_response(response, complete):
+        return
+    _response_cache.append((time.monotonic(), normalize_location(location), item_emb, response))
+    if len(_response_cache) > RESPONSE_CACHE_SIZE:
+        _response_cache.pop(0)
 
 def get_review_snippet(r: Dict) -> str:
     ex = r.get("extracted_snippet")
@@ -33,56 +204,181 @@ def get_review_snippet(r: Dict) -> str:
             return v.strip()
     return ""
 
-def ollama_generate(prompt: str, temperature: float = 0.5) -> str:
+def ollama_generate(
+    prompt: str,
+    temperature: float = 0.5,
+    num_predict: int = 120,
+    keep_alive: str = OLLAMA_KEEP_ALIVE,
+    format: Optional[Union[str, Dict]] = None,
+    stop_at_json_end: bool = False,
+) -> str:
+    """format: "json" or a JSON schema; Ollama then constrains decoding to match it."""
     payload = {
         "model": OLLAMA_MODEL,
         "prompt": prompt,
-        "stream": False,
-        "options": {"temperature": temperature, "num_predict": 180},
+        "stream": stop_at_json_end,
+        "keep_alive": keep_alive,
+        "options": {"temperature": temperature, "num_predict": num_predict},
     }
-    r = requests.post(OLLAMA_URL, json=payload, timeout=120)
+    if format is not None:
+        payload["format"] = format
+    if stop_at_json_end:
+        return ollama_stream_json(payload)
+    r = session.post(OLLAMA_URL, json=payload, timeout=120)
     r.raise_for_status()
     return (r.json().get("response") or "").strip()
 
+def ollama_stream_json(payload: Dict) -> str:
+    """
+    Stream tokens and hang up as soon as the first top-level JSON object/array
+    is closed, so we don't pay for whatever the model rambles on with after it.
+    """
+    parts = []
+    tracker = JsonEndTracker()
+    with session.post(OLLAMA_URL, json=payload, timeout=120, stream=True) as r:
+        r.raise_for_status()
+        for line in r.iter_lines():
+            if not line:
+                continue
+            chunk = json.loads(line)
+            if chunk.get("error"):
+                raise RuntimeError(f"Ollama error: {chunk['error']}")
+            piece = chunk.get("response") or ""
+            end = tracker.feed(piece)
+            if end >= 0:
+                # leaving the with-block closes the connection,
+                # which makes Ollama stop generating
+                parts.append(piece[:end])
+                return "".join(parts).strip()
+            parts.append(piece)
+            if chunk.get("done"):
+                break
+    return "".join(parts).strip()
+
+# Ollama constrains the expansion reply to this shape
+EXPANSION_SCHEMA = {
+    "type": "object",
+    "properties": {"alts": {"type": "array", "items": {"type": "string"}}},
+    "required": ["alts"],
+}
+
 def expand_query_phi3(query: str) -> list[str]:
+    query = normalize_cache_key(query)
+    try:
+        return list(_expand_query_cached(query))
+    except ValueError:
+        # lru_cache doesn't store exceptions, so the next request retries
+        return [query]
+
+@lru_cache(maxsize=1024)
+def _expand_query_cached(query: str) -> tuple[str, ...]:
+    """Raises ValueError on an unusable reply so it isn't cached."""
     prompt = f"""
 List 8-12 alternative names or closely related dishes someone might mean by: "{query}".
-Return ONLY a JSON array of strings. No extra text.
-Example: ["...", "..."]
+Return ONLY a JSON object with the list under "alts". No extra text.
+Example: {{"alts": ["...", "..."]}}
 """.strip()
-    out = ollama_generate(prompt, temperature=0.2)
+    out = ollama_generate(prompt, temperature=0.2, num_predict=90, format=EXPANSION_SCHEMA, stop_at_json_end=True)
     try:
-        arr = json.loads(out)
-        if isinstance(arr, list):
-            return [str(x) for x in arr if str(x).strip()]
-    except Exception:
-        pass
-    return [query]
-
-def semantic_filter_reviews_expanded(reviews: list[dict], query: str, threshold: float = 0.45) -> list[dict]:
-    expansions = expand_query_phi3(query)
-    q_embs = [embed(q) for q in expansions[:12]]
+        names = json.loads(out)["alts"]
+    except json.JSONDecodeError:
+        # the schema guarantees valid JSON, so num_predict cut the reply off:
+        # keep the names that were finished
+        names = complete_array_items(out, "alts")
+    alts = tuple(a.strip() for a in names if isinstance(a, str) and a.strip())
+    if not alts:
+        raise ValueError(f"no expansions returned for {query!r}")
+    return alts
+
+# too common to say anything about whether a review mentions the dish
+LEXICAL_STOPWORDS = frozenset({"and", "the", "with", "for", "style"})
+
+# anything that isn't a letter/digit in any script (\w minus underscore)
+_NON_ALNUM = re.compile(r"[\W_]+")
+
+# combining diacritics that NFKD splits off Latin/Greek/Cyrillic letters
+_COMBINING_MARKS = re.compile("[\u0300-\u036f\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f]+")
+
+def strip_accents(s: str) -> str:
+    # "crème brûlée" -> "creme brulee", "phở" -> "pho"; most reviews are plain ASCII
+    if s.isascii():
+        return s
+    return _COMBINING_MARKS.sub("", unicodedata.normalize("NFKD", s))
+
+def normalize_text(s: str) -> str:
+    # str.split() collapses and trims whitespace in C, no second regex pass needed
+    return " ".join(_NON_ALNUM.sub(" ", strip_accents((s or "").lower())).split())
+
+def expansion_vocab(query: str, expansions: list[str]) -> set[str]:
+    texts = [query, *expansions]
+    return {
+        t for e in texts for t in normalize_text(e).split()
+        if len(t) >= 3 and t not in LEXICAL_STOPWORDS
+    }
 
-    kept = []
+def dish_matches_review(vocab: set[str], review_tokens: set[str], min_ratio: float = 0.88) -> bool:
+    if vocab & review_tokens:
+        return True
+    # spelling variants ("biriyani" vs "biryani"); extractOne scans the tokens
+    # in C and skips ones whose length already rules out the cutoff
+    for qt in vocab:
+        if process.extractOne(qt, review_tokens, scorer=fuzz.ratio, score_cutoff=min_ratio * 100) is not None:
+            return True
+    return False
+
+def embed_query_expansions(query: str) -> tuple[np.ndarray, set[str]]:
+    """
+    Expands the query once and returns (Q, vocab) built from the same expansions:
+    the normalized embedding rows and the token set for the lexical prefilter.
+    """
+    expansions = expand_query_phi3(query)[:12]
+    return embed(expansions, batch_size=16, role="query"), expansion_vocab(query, expansions)
+
+def semantic_filter_reviews(
+    reviews: list[dict],
+    Q,
+    threshold: float = SEMANTIC_THRESHOLD,
+    vocab: Optional[set[str]] = None,
+) -> list[dict]:
+    """
+    Keep reviews whose snippet is close to any row of Q (normalized query-expansion embeddings).
+    If vocab is non-empty, snippets sharing no (fuzzy) token with it are dropped before
+    embedding; an empty vocab means there is nothing to prefilter on, so everything is embedded.
+    """
+    # repeated reviews (across pages, or copy-pasted) are embedded and scored once
+    unique: Dict[str, int] = {}
+    snippet_idx, candidates = [], []
     for r in reviews:
         sn = get_review_snippet(r)
         if not sn:
             continue
-        s_emb = embed(sn)
-        best = max(float(util.cos_sim(qe, s_emb)[0][0]) for qe in q_embs)
-        if best >= threshold:
-            rr = dict(r)
-            rr["_semantic_score"] = round(best, 3)
-            kept.append(rr)
-
-    kept.sort(key=lambda x: x.get("_semantic_score", 0), reverse=True)
+        if vocab and not dish_matches_review(vocab, set(normalize_text(sn).split())):
+            continue
+        snippet_idx.append(unique.setdefault(normalize_cache_key(sn), len(unique)))
+        candidates.append(r)
+    if not candidates:
+        return []
+
+    # embeddings are L2-normalized, so cosine similarity is a plain dot product:
+    # one (Q, U) GEMM instead of Q*N cos_sim calls
+    S = embed(list(unique), batch_size=64)
+    best = (Q @ S.T).max(axis=0)[snippet_idx]
+    # rank in numpy; the reviews above threshold are a prefix of the ranking
+    order = np.argsort(-best, kind="stable")
+    n_keep = int((best >= threshold).sum())
+    keep_idx = order[:n_keep].tolist()
+
+    kept = []
+    for i in keep_idx:
+        rr = dict(candidates[i])
+        rr["_semantic_score"] = round(float(best[i]), 3)
+        kept.append(rr)
     return kept
 
-def phi3_summarize_place(place_name: str, item: str, focused_reviews: List[Dict], all_fetched_count: int) -> str:
-    total = len(focused_reviews)
-    if total == 0:
-        return f"No reviews mentioning {item} were found in the {all_fetched_count} reviews fetched."
+def no_mentions_summary(item: str, all_fetched_count: int) -> str:
+    return f"No reviews mentioning {item} were found in the {all_fetched_count} reviews fetched."
 
+def summary_inputs(focused_reviews: List[Dict]) -> tuple[int, int, List[str]]:
     pos = sum(1 for r in focused_reviews if isinstance(r.get("rating"), (int, float)) and r["rating"] >= 4)
     neg = sum(1 for r in focused_reviews if isinstance(r.get("rating"), (int, float)) and r["rating"] <= 2)
 
@@ -93,6 +389,14 @@ def phi3_summarize_place(place_name: str, item: str, focused_reviews: List[Dict]
             snippets.append(sn[:320])
         if len(snippets) >= MAX_SNIPPETS_TO_SEND:
             break
+    return pos, neg, snippets
+
+def phi3_summarize_place(place_name: str, item: str, focused_reviews: List[Dict], all_fetched_count: int) -> str:
+    total = len(focused_reviews)
+    if total == 0:
+        return no_mentions_summary(item, all_fetched_count)
+
+    pos, neg, snippets = summary_inputs(focused_reviews)
 
     low_n_note = "There are only a few mentions, so be cautious and avoid strong generalizations." if total < 5 else ""
 
@@ -113,12 +417,32 @@ def phi3_summarize_place(place_name: str, item: str, focused_reviews: List[Dict]
         {chr(10).join("- " + s for s in snippets)}
         """.strip()
 
-    return ollama_generate(prompt, temperature=0.55)
+    return ollama_generate(prompt, temperature=0.55, num_predict=180)
+
+# decoding is constrained to this shape, so the reply always parses
+SUMMARY_BATCH_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summaries": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "id": {"type": "integer"},
+                    "summary": {"type": "string"},
+                },
+                "required": ["id", "summary"],
+            },
+        },
+    },
+    "required": ["summaries"],
+}
 
-def phi3_summarize_batch(item: str, batch: List[Dict]) -> Dict[str, str]:
+def phi3_summarize_batch(item: str, batch: List[Dict]) -> Dict[int, str]:
     """
     batch: list of dicts:
       {
+        "id": int,  # unique per place; titles repeat for chains
         "place": "<place title>",
         "pos": int,
         "neg": int,
@@ -126,20 +450,20 @@ def phi3_summarize_batch(item: str, batch: List[Dict]) -> Dict[str, str]:
         "all_fetched_count": int,
         "snippets": [str, ...]
       }
-    returns: { "<place title>": "<summary>", ... }
+    returns: { <id>: "<summary>", ... }
     """
 
-    # Keep prompt compact (speed). Also reduce generation length.
-    # You can tune num_predict in ollama_generate() too; see note at bottom.
+    # Keep prompt compact (speed). Generation length scales with the batch.
     prompt = f"""
         You will write short, natural summaries of review snippets for ONE dish.
 
         Dish: "{item}"
 
-        Return ONLY valid JSON in this exact format:
+        Return JSON in this exact format, with one entry per input place and
+        "id" copied from that place's input entry:
         {{
         "summaries": [
-            {{"place": "PLACE_NAME", "summary": "ONE PARAGRAPH"}}
+            {{"id": PLACE_ID, "summary": "ONE PARAGRAPH"}}
         ]
         }}
 
@@ -156,54 +480,111 @@ def phi3_summarize_batch(item: str, batch: List[Dict]) -> Dict[str, str]:
         {json.dumps({"item": item, "places": batch}, ensure_ascii=False)}
         """.strip()
 
-    out = ollama_generate(prompt, temperature=0.45)
+    out = ollama_generate(
+        prompt,
+        temperature=0.45,
+        num_predict=min(2048, 140 * len(batch)),
+        format=SUMMARY_BATCH_SCHEMA,
+        stop_at_json_end=True,
+    )
 
     try:
-        data = json.loads(out)
-        arr = data.get("summaries", [])
-        if isinstance(arr, list):
-            m = {}
-            for x in arr:
-                if isinstance(x, dict):
-                    place = str(x.get("place") or "").strip()
-                    summary = str(x.get("summary") or "").strip()
-                    if place and summary:
-                        m[place] = summary
-            return m
-    except Exception:
-        pass
-
-    # Fallback: if model returns non-JSON, return empty mapping
-    return {}
-
-def run(location: str, item: str) -> dict:
-    places = search_places_for_item_near_location(item, location, limit=MAX_PLACES) or []
+        entries = json.loads(out)["summaries"]
+    except json.JSONDecodeError:
+        # the schema guarantees valid JSON, so num_predict cut the reply off:
+        # keep the entries that were finished; run_async redoes the rest per place
+        entries = complete_array_items(out, "summaries")
+
+    m = {}
+    for x in entries:
+        summary = x["summary"].strip()
+        if summary:
+            m[x["id"]] = summary
+    return m
+
+async def run_async(location: str, item: str, client: Optional[httpx.AsyncClient] = None) -> dict:
+    """
+    client: a long-lived httpx.AsyncClient for SerpAPI (the app shares one across
+    requests so connections stay warm); a temporary one is opened if omitted.
+    """
+    if client is None:
+        async with httpx.AsyncClient(timeout=SERPAPI_TIMEOUT) as client:
+            return await run_async(location, item, client)
+
+    # a near-identical item at the same location skips SerpAPI, embedding and Ollama entirely;
+    # the cached response keeps its own "item" so the summaries still match it
+    item_emb = (await asyncio.to_thread(embed, [item], role="query"))[0]
+    cached = lookup_cached_response(location, item_emb)
+    if cached is not None:
+        return cached
+
+    # SerpAPI is awaited on the event loop; Ollama calls and the CPU-bound
+    # encoder run in worker threads so the loop stays free for other requests
+    places = await search_places_async(client, item, location, limit=MAX_PLACES) or []
     # with open("reviews/multiple_places_all_places.json", "r", encoding="utf-8") as f:
     #     places = json.load(f)
+    places = [p for p in places if p.get("data_id")]  # skip broken entries
     if not places:
         return {"location": location, "item": item, "results": []}
 
-    results = []
-    for p in places:
-        title = p.get("title") or "Unknown place"
-        data_id = p.get("data_id")
-        if not data_id:
-            continue  # skip broken entries
-        
-        # place_name = p["title"].lower().replace(" ", "_")
-        # with open(f"reviews/{place_name}_all_reviews.json", "r", encoding="utf-8") as f:
-        #     reviews = json.load(f)
-
-        reviews = fetch_reviews(data_id, max_reviews=MAX_REVIEWS_PER_PLACE) or []
-
-        focused = semantic_filter_reviews_expanded(reviews, item, threshold=0.45)
-
-        summary = phi3_summarize_place(
-            place_name=title,
+    # place_name = p["title"].lower().replace(" ", "_")
+    # with open(f"reviews/{place_name}_all_reviews.json", "r", encoding="utf-8") as f:
+    #     reviews = json.load(f)
+
+    # expansions are the same for every place: expand and embed them once,
+    # while the first SerpAPI pages are still in flight
+    query_task = asyncio.create_task(asyncio.to_thread(embed_query_expansions, item))
+
+    async def fetch_and_filter(p: Dict) -> tuple[List[Dict], List[Dict], bool]:
+        # pagination stays sequential within a place, but places overlap each
+        # other, and a place is embedded as soon as its reviews are in
+        reviews, complete = await fetch_reviews_async(client, p["data_id"], max_reviews=MAX_REVIEWS_PER_PLACE)
+        Q, vocab = await query_task
+        focused = await asyncio.to_thread(semantic_filter_reviews, reviews, Q, threshold=SEMANTIC_THRESHOLD, vocab=vocab)
+        return reviews, focused, complete
+
+    per_place = await asyncio.gather(*[fetch_and_filter(p) for p in places])
+
+    fetched = [reviews for reviews, _, _ in per_place]
+    focused_by_place = [focused for _, focused, _ in per_place]
+    all_complete = all(complete for _, _, complete in per_place)
+
+    # one Ollama call for every place that has mentions; places without any
+    # get the canned "no reviews" line and never reach the model
+    batch = []
+    for i, (p, reviews, focused) in enumerate(zip(places, fetched, focused_by_place)):
+        if not focused:
+            continue
+        pos, neg, snippets = summary_inputs(focused)
+        batch.append({
+            "id": i,
+            "place": p.get("title") or "Unknown place",
+            "pos": pos,
+            "neg": neg,
+            "total": len(focused),
+            "all_fetched_count": len(reviews),
+            "snippets": snippets,
+        })
+    summaries = await asyncio.to_thread(phi3_summarize_batch, item, batch) if batch else {}
+
+    # places the batch reply left out are summarized one by one
+    missing = [x["id"] for x in batch if x["id"] not in summaries]
+    redone = await asyncio.gather(*[
+        asyncio.to_thread(
+            phi3_summarize_place,
+            place_name=places[i].get("title") or "Unknown place",
             item=item,
-            focused_reviews=focused,
-            all_fetched_count=len(reviews),
+            focused_reviews=focused_by_place[i],
+            all_fetched_count=len(fetched[i]),
         )
+        for i in missing
+    ])
+    summaries.update(zip(missing, redone))
+
+    results = []
+    for i, (p, reviews, focused) in enumerate(zip(places, fetched, focused_by_place)):
+        title = p.get("title") or "Unknown place"
+        summary = summaries[i] if focused else no_mentions_summary(item, len(reviews))
 
         results.append({
             "place": {
@@ -216,5 +597,9 @@ def run(location: str, item: str) -> dict:
             "summary": summary,
         })
 
-    return {"location": location, "item": item, "results": results}
+    response = {"location": location, "item": item, "results": results}
+    store_cached_response(location, item_emb, response, complete=all_complete)
+    return response
 
+def run(location: str, item: str) -> dict:
+    return asyncio.run(run_async(location, item))
@@ -0,0 +1,69 @@
+import unittest
+
+from json_stream import JsonEndTracker, complete_array_items
+
+
+def feed_all(pieces):
+    """Returns (index of the piece that closed the JSON, end offset in it), or None."""
+    tracker = JsonEndTracker()
+    for n, piece in enumerate(pieces):
+        end = tracker.feed(piece)
+        if end >= 0:
+            return n, end
+    return None
+
+
+class JsonEndTrackerTest(unittest.TestCase):
+    def test_closes_on_matching_brace(self):
+        self.assertEqual(feed_all(['{"a": 1}']), (0, 8))
+
+    def test_skips_text_before_the_json(self):
+        self.assertEqual(feed_all(['Sure! {"a": [1, 2]}']), (0, 19))
+
+    def test_close_brace_in_the_middle_of_a_chunk(self):
+        pieces = ['{"a": ', '1} and then some more {"b": 2}']
+        n, end = feed_all(pieces)
+        self.assertEqual((n, pieces[n][:end]), (1, "1}"))
+
+    def test_brackets_inside_strings_are_ignored(self):
+        text = '{"place": "A}]{[", "summary": "x ] y"}'
+        self.assertEqual(feed_all([text]), (0, len(text)))
+
+    def test_escaped_quote_does_not_end_the_string(self):
+        text = '{"summary": "he said \\"great}\\" twice"}'
+        self.assertEqual(feed_all([text]), (0, len(text)))
+
+    def test_escape_split_across_chunks(self):
+        pieces = ['{"s": "a\\', '"}"', "}"]
+        self.assertEqual(feed_all(pieces), (2, 1))
+
+    def test_escaped_backslash_before_closing_quote(self):
+        text = '{"s": "a\\\\"}'
+        self.assertEqual(feed_all([text]), (0, len(text)))
+
+    def test_top_level_array(self):
+        self.assertEqual(feed_all(['["a", ', '"b"]', ' tail']), (1, 4))
+
+    def test_unclosed_json_never_reports_an_end(self):
+        self.assertIsNone(feed_all(['{"summaries": [{"id": 0, "summary": "cut o']))
+
+
+class CompleteArrayItemsTest(unittest.TestCase):
+    def test_keeps_finished_entries_of_a_truncated_reply(self):
+        text = '{"summaries": [{"id": 0, "summary": "Good {spicy}."}, {"id": 2, "summary": "Ok"}, {"id": 3, "summ'
+        self.assertEqual(
+            complete_array_items(text, "summaries"),
+            [{"id": 0, "summary": "Good {spicy}."}, {"id": 2, "summary": "Ok"}],
+        )
+
+    def test_complete_reply_returns_every_entry(self):
+        text = '{"summaries": [ {"id": 0, "summary": "a"} ,\n{"id": 1, "summary": "b"} ]}'
+        self.assertEqual([x["id"] for x in complete_array_items(text, "summaries")], [0, 1])
+
+    def test_cut_before_the_array_returns_nothing(self):
+        self.assertEqual(complete_array_items('{"summar', "summaries"), [])
+        self.assertEqual(complete_array_items('{"summaries": [{"id": 0, "sum', "summaries"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import service
+
+
+def review(text, rating=5):
+    return {"snippet": text, "rating": rating}
+
+
+def fake_embed(texts, batch_size=64, role="document"):
+    # every snippet points the same way as the single query row below
+    return np.tile(np.array([1.0, 0.0], dtype=np.float32), (len(texts), 1))
+
+
+Q = np.array([[1.0, 0.0]], dtype=np.float32)
+
+
+class NormalizeTextTest(unittest.TestCase):
+    def test_strips_accents_instead_of_splitting_words(self):
+        self.assertEqual(service.normalize_text("Crème brûlée!"), "creme brulee")
+        self.assertEqual(service.normalize_text("phở"), "pho")
+        self.assertEqual(service.normalize_text("Phở bò_tái"), "pho bo tai")
+
+    def test_keeps_non_latin_letters(self):
+        self.assertEqual(service.normalize_text("拉面, 好吃"), "拉面 好吃")
+
+    def test_ascii_is_lowercased_and_collapsed(self):
+        self.assertEqual(service.normalize_text("  Chicken   TIKKA-masala "), "chicken tikka masala")
+
+
+class LexicalPrefilterTest(unittest.TestCase):
+    def test_short_accented_query_keeps_its_token(self):
+        self.assertIn("pho", service.expansion_vocab("phở", []))
+
+    def test_accented_review_matches_ascii_expansion(self):
+        vocab = service.expansion_vocab("creme brulee", [])
+        tokens = set(service.normalize_text("La crème brûlée était parfaite").split())
+        self.assertTrue(service.dish_matches_review(vocab, tokens))
+
+    def test_fuzzy_spelling_variant_matches(self):
+        self.assertTrue(service.dish_matches_review({"biryani"}, {"the", "biriyani", "was"}))
+        self.assertFalse(service.dish_matches_review({"biryani"}, {"pizza", "was", "great"}))
+
+    def test_empty_vocab_disables_the_prefilter(self):
+        reviews = [review("great noodles"), review("lovely broth")]
+        with mock.patch.object(service, "embed", fake_embed):
+            kept = service.semantic_filter_reviews(reviews, Q, threshold=0.5, vocab=set())
+        self.assertEqual(len(kept), 2)
+
+    def test_vocab_drops_reviews_without_overlap(self):
+        reviews = [review("great pho here"), review("lovely service")]
+        with mock.patch.object(service, "embed", fake_embed):
+            kept = service.semantic_filter_reviews(reviews, Q, threshold=0.5, vocab={"pho"})
+        self.assertEqual([r["snippet"] for r in kept], ["great pho here"])
+
+    def test_q_and_vocab_come_from_one_expansion_call(self):
+        with mock.patch.object(service, "expand_query_phi3", return_value=["pho bo", "beef noodle soup"]) as expand, \
+                mock.patch.object(service, "embed", fake_embed):
+            Q_rows, vocab = service.embed_query_expansions("phở")
+        expand.assert_called_once()
+        self.assertEqual(Q_rows.shape, (2, 2))
+        self.assertEqual(vocab, {"pho", "beef", "noodle", "soup"})
+
+
+if __name__ == "__main__":
+    unittest.main()
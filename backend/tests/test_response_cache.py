@@ -0,0 +1,134 @@
+import asyncio
+import json
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import service
+
+
+def unit(*xs):
+    v = np.array(xs, dtype=np.float32)
+    return v / np.linalg.norm(v)
+
+
+def result(reviews_fetched=10, summary="Tasty."):
+    return {"place": {"title": "A"}, "reviews_fetched": reviews_fetched, "mentions": 1, "summary": summary}
+
+
+def response(*results):
+    return {"location": "Palo Alto", "item": "coffee", "results": list(results)}
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        service._response_cache.clear()
+
+    def tearDown(self):
+        service._response_cache.clear()
+
+    def test_same_location_and_item_hits_regardless_of_case_and_spacing(self):
+        r = response(result())
+        service.store_cached_response("Arlington, VA", unit(1, 0), r)
+        self.assertIs(service.lookup_cached_response("  arlington,   va ", unit(1, 0)), r)
+
+    def test_other_location_never_hits(self):
+        service.store_cached_response("Arlington, VA", unit(1, 0), response(result()))
+        self.assertIsNone(service.lookup_cached_response("Arlington, TX", unit(1, 0)))
+
+    def test_dissimilar_item_misses(self):
+        service.store_cached_response("Palo Alto", unit(1, 0), response(result()))
+        self.assertIsNone(service.lookup_cached_response("Palo Alto", unit(1, 1)))
+
+    def test_entries_expire_after_ttl(self):
+        with mock.patch.object(service.time, "monotonic", return_value=1000.0):
+            service.store_cached_response("Palo Alto", unit(1, 0), response(result()))
+        later = 1000.0 + service.RESPONSE_CACHE_TTL + 1
+        with mock.patch.object(service.time, "monotonic", return_value=later):
+            self.assertIsNone(service.lookup_cached_response("Palo Alto", unit(1, 0)))
+        self.assertEqual(service._response_cache, [])
+
+    def test_degraded_responses_are_not_stored(self):
+        for r, complete in [
+            (response(result(), result(reviews_fetched=0)), True),
+            (response(result(summary="")), True),
+            (response(result()), False),
+            (response(), True),
+        ]:
+            service.store_cached_response("Palo Alto", unit(1, 0), r, complete=complete)
+        self.assertEqual(service._response_cache, [])
+
+    def test_healthy_response_is_stored(self):
+        self.assertTrue(service.is_cacheable_response(response(result(), result())))
+
+
+class SummarizeBatchTest(unittest.TestCase):
+    batch = [
+        {"id": 0, "place": "Starbucks", "pos": 1, "neg": 0, "total": 1, "all_fetched_count": 5, "snippets": ["x"]},
+        {"id": 3, "place": "Starbucks", "pos": 0, "neg": 1, "total": 1, "all_fetched_count": 5, "snippets": ["y"]},
+    ]
+
+    def test_same_named_places_keep_separate_summaries(self):
+        reply = json.dumps({"summaries": [{"id": 0, "summary": "Loved it."}, {"id": 3, "summary": "Too bitter."}]})
+        with mock.patch.object(service, "ollama_generate", return_value=reply):
+            self.assertEqual(service.phi3_summarize_batch("latte", self.batch), {0: "Loved it.", 3: "Too bitter."})
+
+    def test_truncated_reply_keeps_finished_entries(self):
+        reply = '{"summaries": [{"id": 0, "summary": "Loved it."}, {"id": 3, "summ'
+        with mock.patch.object(service, "ollama_generate", return_value=reply):
+            self.assertEqual(service.phi3_summarize_batch("latte", self.batch), {0: "Loved it."})
+
+
+class RunAsyncTest(unittest.TestCase):
+    places = [
+        {"title": "Starbucks", "data_id": "a"},
+        {"title": "Starbucks", "data_id": "b"},
+        {"title": "Blue Bottle", "data_id": "c"},
+    ]
+
+    def setUp(self):
+        service._response_cache.clear()
+
+    def tearDown(self):
+        service._response_cache.clear()
+
+    def run_with(self, fetch_results, batch_summaries):
+        async def search_places(client, item, location, limit=5):
+            return self.places
+
+        async def fetch_reviews(client, data_id, max_reviews=100):
+            return fetch_results[data_id]
+
+        def summarize_place(place_name, item, focused_reviews, all_fetched_count):
+            return f"single:{place_name}"
+
+        patches = [
+            mock.patch.object(service, "embed", return_value=unit(1, 0)[None, :]),
+            mock.patch.object(service, "search_places_async", search_places),
+            mock.patch.object(service, "fetch_reviews_async", fetch_reviews),
+            mock.patch.object(service, "embed_query_expansions", return_value=(unit(1, 0)[None, :], {"latte"})),
+            mock.patch.object(service, "semantic_filter_reviews", side_effect=lambda reviews, Q, **kw: list(reviews)),
+            mock.patch.object(service, "phi3_summarize_batch", return_value=batch_summaries),
+            mock.patch.object(service, "phi3_summarize_place", side_effect=summarize_place),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        return asyncio.run(service.run_async("Palo Alto", "latte", client=object()))
+
+    def test_places_missing_from_the_batch_reply_are_summarized_singly(self):
+        reviews = [{"snippet": "latte was great", "rating": 5}]
+        out = self.run_with({"a": (reviews, True), "b": (reviews, True), "c": (reviews, True)}, {0: "batch:0"})
+        self.assertEqual([r["summary"] for r in out["results"]], ["batch:0", "single:Starbucks", "single:Blue Bottle"])
+        self.assertEqual(len(service._response_cache), 1)
+
+    def test_failed_place_degrades_without_failing_or_caching(self):
+        reviews = [{"snippet": "latte was great", "rating": 5}]
+        out = self.run_with({"a": (reviews, True), "b": (reviews[:1], False), "c": ([], False)}, {0: "x", 1: "y"})
+        self.assertEqual([r["reviews_fetched"] for r in out["results"]], [1, 1, 0])
+        self.assertEqual(service._response_cache, [])
+
+
+if __name__ == "__main__":
+    unittest.main()